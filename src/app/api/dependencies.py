@@ -1,26 +1,88 @@
-import json
+import asyncio
+import time
 
-from httpx import AsyncClient
-from fastcrud.exceptions.http_exceptions import NotFoundException
+from fastapi import Request
+from httpx import AsyncClient, Limits
 
 from ..core.config import settings
+from ..core.exceptions.http_exceptions import NotFoundException
+from ..core.utils.http import error_detail
 
 TENANT_ID = settings.TENANT_ID
 CLIENT_ID = settings.CLIENT_ID
 CLIENT_SECRET = settings.CLIENT_SECRET
 
+TOKEN_URL = f"https://login.microsoftonline.com/{TENANT_ID}/oauth2/v2.0/token"
+TOKEN_SCOPE = "https://graph.microsoft.com/.default"
+# Refresh this many seconds before the token actually expires.
+TOKEN_EXPIRY_LEEWAY = 300
+# The identity endpoint throttles with 429/503; retry a few times before failing the request.
+TOKEN_MAX_RETRIES = 3
+TOKEN_MAX_RETRY_WAIT = 10.0
+TOKEN_RETRY_STATUSES = (429, 503)
+
+TOKEN_CLIENT_LIMITS = Limits(max_keepalive_connections=8)
+
+# Shared client so the TLS session to the identity endpoint is reused; closed in the app lifespan.
+token_client = AsyncClient(timeout=10, limits=TOKEN_CLIENT_LIMITS)
+
+_token_cache: dict[str, tuple[str, float]] = {}
+_token_lock = asyncio.Lock()
+
+
 async def get_ms_token() -> str:
-    scope = "https://graph.microsoft.com/.default"
+    cached = _token_cache.get(TENANT_ID)
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
+
+    async with _token_lock:
+        # Another request may have refreshed the token while we waited for the lock.
+        cached = _token_cache.get(TENANT_ID)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+
+        attempt = 0
+        while True:
+            response = await token_client.post(
+                TOKEN_URL,
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": CLIENT_ID,
+                    "client_secret": CLIENT_SECRET,
+                    "scope": TOKEN_SCOPE,
+                },
+            )
+            if response.status_code not in TOKEN_RETRY_STATUSES or attempt >= TOKEN_MAX_RETRIES:
+                break
 
-    async with AsyncClient() as client:
-        token_result = await client.post(f"https://login.microsoftonline.com/{TENANT_ID}/oauth2/v2.0/token", data={
-            "grant_type": "client_credentials",
-            "client_id": CLIENT_ID, 
-            "client_secret": CLIENT_SECRET, 
-            "scope": scope
-        }).json()
+            attempt += 1
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else float(attempt)
+            await asyncio.sleep(min(delay, TOKEN_MAX_RETRY_WAIT))
 
+        # Check the status before parsing: throttling and gateway errors often come back as HTML.
+        if response.status_code != 200:
+            raise NotFoundException(f"Error while getting access token: {error_detail(response)}")
+
+        token_result = response.json()
         if "access_token" not in token_result:
-            raise NotFoundException(f"Error while getting access token: {json.dumps(token_result, indent=4)}")
+            raise NotFoundException(f"Error while getting access token: {token_result}")
+
+        access_token: str = token_result["access_token"]
+        expires_at = time.monotonic() + int(token_result.get("expires_in", 3599)) - TOKEN_EXPIRY_LEEWAY
+        _token_cache[TENANT_ID] = (access_token, expires_at)
+
+        return access_token
+
+
+async def close_token_client() -> None:
+    """Close the identity endpoint client and swap in a fresh one so a later app lifespan can still fetch tokens."""
+    global token_client
+    await token_client.aclose()
+    token_client = AsyncClient(timeout=10, limits=TOKEN_CLIENT_LIMITS)
+
 
-        return token_result.json()["access_token"]
\ No newline at end of file
+def get_graph_client(request: Request) -> AsyncClient:
+    """Return the pooled Microsoft Graph client created in the application lifespan."""
+    graph_client: AsyncClient = request.app.state.graph_client
+    return graph_client
@@ -1,84 +1,174 @@
-from fastcrud.exceptions.http_exceptions import CustomException
-from httpx import AsyncClient
+import asyncio
+from datetime import UTC, datetime
 from typing import Annotated
+from urllib.parse import quote, urlencode
 
-from fastapi import APIRouter, Depends
-
-from src.app.schemas.attachment import AttachmentBase
-from src.app.schemas.email import EmailBase
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+from httpx import Response as GraphResponse
+from starlette.background import BackgroundTask
 
-from ...core.config import settings
-from ...api.dependencies import get_ms_token
+from ...api.dependencies import get_graph_client, get_ms_token
+from ...core.config import EnvironmentOption, settings
+from ...core.exceptions.http_exceptions import CustomException
+from ...core.utils.cache import TTLCache
+from ...core.utils.http import error_detail
+from ...schemas.attachment import AttachmentBase, AttachmentList
+from ...schemas.email import EmailBase, EmailList
 
 router = APIRouter(tags=["inbox"])
 
-# Get all emails from a user's inbox
-@router.get("/inbox/{user_id}")
-async def get_emails(user_id: str, access_token: Annotated[str, Depends(get_ms_token)]) -> list[EmailBase]:
-  access_token = await get_ms_token()
-  headers = {
-    "Authorization": f"Bearer {access_token}"
-  }
+# Graph response bodies keyed by request path, so repeat reads within the TTL skip the upstream round-trip.
+graph_cache: TTLCache[bytes] = TTLCache(maxsize=settings.GRAPH_CACHE_MAX_SIZE, ttl=settings.GRAPH_CACHE_TTL)
 
-  url = f"{settings.GRAPH_API_URL}/{user_id}/messages"
+# Bounds in-flight Graph calls so bursts queue here instead of tripping the tenant throttle.
+graph_semaphore = asyncio.Semaphore(settings.GRAPH_MAX_CONCURRENCY)
+# Listings change as mail arrives; a single attachment never changes for a given id.
+LIST_CACHE_CONTROL = "private, max-age=15"
+ATTACHMENT_CACHE_CONTROL = "private, max-age=86400, immutable"
+# Listings only need attachment metadata; the inline base64 content is fetched per attachment.
+ATTACHMENT_LIST_SELECT = "id,lastModifiedDateTime,name,contentType,size,isInline"
+# Upper bound on how long a single throttled call waits before retrying, whatever Retry-After says.
+GRAPH_MAX_RETRY_WAIT = 30.0
 
-  async with AsyncClient() as client:
-    response = await client.get(url, headers=headers)
 
-    if response.status_code != 200:
-      raise CustomException(status_code=response.status_code, detail=response.json())
+def _retry_delay(response: GraphResponse, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After", "")
+    delay = float(retry_after) if retry_after.isdigit() else 2.0**attempt
+    return min(delay, GRAPH_MAX_RETRY_WAIT)
 
-    return response.json()
 
-# Get a specific email from a user's inbox
-@router.get("/inbox/{user_id}/messages/{message_id}")
-async def get_email(user_id: str, message_id: str, access_token: Annotated[str, Depends(get_ms_token)]) -> EmailBase:
-  access_token = await get_ms_token()
-  headers = {
-    "Authorization": f"Bearer {access_token}"
-  }
+async def _graph_request(client: AsyncClient, path: str, access_token: str, stream: bool = False) -> GraphResponse:
+    request = client.build_request("GET", path, headers={"Authorization": f"Bearer {access_token}"})
 
-  url = f"{settings.GRAPH_API_URL}/{user_id}/messages/{message_id}"
+    attempt = 0
+    while True:
+        async with graph_semaphore:
+            response = await client.send(request, stream=stream)
 
-  async with AsyncClient() as client:
-    response = await client.get(url, headers=headers)
+        if response.status_code != 429 or attempt >= settings.GRAPH_MAX_RETRIES:
+            break
+
+        attempt += 1
+        await response.aclose()
+        await asyncio.sleep(_retry_delay(response, attempt))
 
     if response.status_code != 200:
-      raise CustomException(status_code=response.status_code, detail=response.json())
+        await response.aread()
+        raise CustomException(status_code=response.status_code, detail=error_detail(response))
 
-    return response.json()
+    return response
 
-# Get all attachments from an email
-@router.get("/inbox/{user_id}/messages/{message_id}/attachments")
-async def get_attachments(user_id: str, message_id: str, access_token: Annotated[str, Depends(get_ms_token)]) -> list[AttachmentBase]:
-  access_token = await get_ms_token()
-  headers = {
-    "Authorization": f"Bearer {access_token}"
-  }
 
-  url = f"{settings.GRAPH_API_URL}/{user_id}/messages/{message_id}/attachments"
+def _message_filter(received_after: datetime | None, has_attachments: bool | None) -> str | None:
+    clauses = []
+    if has_attachments is not None:
+        clauses.append(f"hasAttachments eq {str(has_attachments).lower()}")
+    if received_after is not None:
+        if received_after.tzinfo is None:
+            received_after = received_after.replace(tzinfo=UTC)
+        clauses.append(f"receivedDateTime ge {received_after.astimezone(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')}")
+    return " and ".join(clauses) or None
 
-  async with AsyncClient() as client:
-    response = await client.get(url, headers=headers)
 
-    if response.status_code != 200:
-      raise CustomException(status_code=response.status_code, detail=response.json())
+async def _fetch_graph(client: AsyncClient, path: str, access_token: str) -> bytes:
+    content = graph_cache.get(path)
+    if content is not None:
+        return content
 
-    return response.json()
+    response = await _graph_request(client, path, access_token)
+
+    graph_cache.set(path, response.content)
+    return response.content
 
-# Get a specific attachment from an email
-@router.get("/inbox/{user_id}/messages/{message_id}/attachments/{attachment_id}")
-async def get_attachment(user_id: str, message_id: str, attachment_id: str, access_token: Annotated[str, Depends(get_ms_token)]) -> AttachmentBase:
-  headers = {
-    "Authorization": f"Bearer {access_token}"
-  }
 
-  url = f"{settings.GRAPH_API_URL}/{user_id}/messages/{message_id}/attachments/{attachment_id}"
+# Get all emails from a user's inbox
+@router.get("/inbox/{user_id}")
+async def get_emails(
+    user_id: str,
+    response: Response,
+    access_token: Annotated[str, Depends(get_ms_token)],
+    client: Annotated[AsyncClient, Depends(get_graph_client)],
+    received_after: datetime | None = None,
+    has_attachments: bool | None = None,
+) -> list[EmailBase]:
+    path = f"/{user_id}/messages"
+    # Filter on the Graph side so out-of-range messages never cross the wire.
+    message_filter = _message_filter(received_after, has_attachments)
+    if message_filter is not None:
+        path += "?" + urlencode({"$filter": message_filter}, safe="$", quote_via=quote)
+
+    content = await _fetch_graph(client, path, access_token)
+
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    return EmailList.model_validate_json(content).value
 
-  async with AsyncClient() as client:
-    response = await client.get(url, headers=headers)
 
-    if response.status_code != 200:
-      raise CustomException(status_code=response.status_code, detail=response.json())
+# Get a specific email from a user's inbox
+@router.get("/inbox/{user_id}/messages/{message_id}", response_model=EmailBase)
+async def get_email(
+    user_id: str,
+    message_id: str,
+    access_token: Annotated[str, Depends(get_ms_token)],
+    client: Annotated[AsyncClient, Depends(get_graph_client)],
+) -> EmailBase | Response:
+    content = await _fetch_graph(client, f"/{user_id}/messages/{message_id}", access_token)
+
+    if settings.ENVIRONMENT != EnvironmentOption.LOCAL:
+        # Graph output is trusted outside local development, so skip validating it twice.
+        return Response(content=content, media_type="application/json")
+
+    return EmailBase.model_validate_json(content)
+
 
-    return response.json()
\ No newline at end of file
+# Get all attachments from an email
+@router.get("/inbox/{user_id}/messages/{message_id}/attachments")
+async def get_attachments(
+    user_id: str,
+    message_id: str,
+    response: Response,
+    access_token: Annotated[str, Depends(get_ms_token)],
+    client: Annotated[AsyncClient, Depends(get_graph_client)],
+) -> list[AttachmentBase]:
+    content = await _fetch_graph(
+        client, f"/{user_id}/messages/{message_id}/attachments?$select={ATTACHMENT_LIST_SELECT}", access_token
+    )
+
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    return AttachmentList.model_validate_json(content).value
+
+
+# Get a specific attachment from an email
+@router.get("/inbox/{user_id}/messages/{message_id}/attachments/{attachment_id}", response_model=AttachmentBase)
+async def get_attachment(
+    user_id: str,
+    message_id: str,
+    attachment_id: str,
+    response: Response,
+    access_token: Annotated[str, Depends(get_ms_token)],
+    client: Annotated[AsyncClient, Depends(get_graph_client)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> AttachmentBase | Response:
+    cache_headers = {"Cache-Control": ATTACHMENT_CACHE_CONTROL, "ETag": f'"{attachment_id}"'}
+
+    if if_none_match is not None and cache_headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=cache_headers)
+
+    graph_response = await _graph_request(
+        client, f"/{user_id}/messages/{message_id}/attachments/{attachment_id}", access_token, stream=True
+    )
+
+    if settings.ENVIRONMENT != EnvironmentOption.LOCAL:
+        # Attachments carry their base64 content inline, so stream the trusted Graph body straight through.
+        return StreamingResponse(
+            graph_response.aiter_bytes(),
+            media_type="application/json",
+            headers=cache_headers,
+            background=BackgroundTask(graph_response.aclose),
+        )
+
+    await graph_response.aread()
+
+    response.headers.update(cache_headers)
+    return AttachmentBase.model_validate_json(graph_response.content)
@@ -33,6 +33,10 @@ class MicrosoftGraphSettings(BaseSettings):
     CLIENT_SECRET: str = config("MS_CLIENT_SECRET", default="")
     
     GRAPH_API_URL: str = config("GRAPH_API_URL", default="https://graph.microsoft.com/v1.0/users")
+    GRAPH_CACHE_TTL: int = config("GRAPH_CACHE_TTL", default=30)
+    GRAPH_CACHE_MAX_SIZE: int = config("GRAPH_CACHE_MAX_SIZE", default=512)
+    GRAPH_MAX_CONCURRENCY: int = config("GRAPH_MAX_CONCURRENCY", default=32)
+    GRAPH_MAX_RETRIES: int = config("GRAPH_MAX_RETRIES", default=3)
 
 class Settings(
     AppSettings,
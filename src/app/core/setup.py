@@ -1,26 +1,74 @@
-from collections.abc import Callable
-from contextlib import _AsyncGeneratorContextManager
+import logging
+from collections.abc import AsyncGenerator, Callable
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
 from typing import Any
 
 import fastapi
 from fastapi import APIRouter, Depends, FastAPI
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
+from httpx import AsyncClient, Limits, Timeout
 
-from ..api.dependencies import get_current_superuser
+from ..api.dependencies import close_token_client, get_current_superuser, get_ms_token
+from ..middleware.etag_middleware import ETagMiddleware
 from .config import (
     AppSettings,
     EnvironmentOption,
     EnvironmentSettings,
+    MicrosoftGraphSettings,
     settings,
 )
 
+logger = logging.getLogger(__name__)
+
+
 # -------------- application --------------
+def lifespan_factory(
+    settings: (
+        AppSettings
+        | EnvironmentSettings
+        | MicrosoftGraphSettings
+    ),
+) -> Callable[[FastAPI], _AsyncGeneratorContextManager[Any]]:
+    """Factory to create a lifespan async context manager for a FastAPI app."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncGenerator:
+        graph_client: AsyncClient | None = None
+        try:
+            if isinstance(settings, MicrosoftGraphSettings):
+                graph_client = app.state.graph_client = AsyncClient(
+                    base_url=settings.GRAPH_API_URL,
+                    http2=True,
+                    limits=Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
+                    timeout=Timeout(10.0),
+                )
+
+                if settings.CLIENT_ID:
+                    # Fetch the Graph token before serving so the first request doesn't pay for it.
+                    try:
+                        await get_ms_token()
+                    except Exception as e:
+                        logger.warning("Could not prefetch Microsoft Graph token at startup: %s", e)
+
+            yield
+
+        finally:
+            # Only close what was opened, so a failed startup surfaces its own error.
+            if graph_client is not None:
+                await graph_client.aclose()
+
+            await close_token_client()
+
+    return lifespan
+
+
 def create_application(
     router: APIRouter,
     settings: (
         AppSettings
         | EnvironmentSettings
+        | MicrosoftGraphSettings
     ),
     lifespan: Callable[[FastAPI], _AsyncGeneratorContextManager[Any]] | None = None,
     **kwargs: Any,
@@ -42,6 +90,11 @@ def create_application(
         - MicrosoftGraphSettings: Microsoft Graph API credentials for Outlook access
         - EnvironmentSettings: Environment-specific configuration (local/staging/production)
 
+    lifespan
+        Optional lifespan context manager. Defaults to one built by ``lifespan_factory`` that
+        opens the pooled HTTP/2 Microsoft Graph client (``app.state.graph_client``), prefetches the
+        Graph token on startup, and closes the shared HTTP clients on shutdown.
+
     **kwargs
         Additional keyword arguments passed directly to the FastAPI constructor.
 
@@ -63,9 +116,14 @@ def create_application(
     if isinstance(settings, EnvironmentSettings):
         kwargs.update({"docs_url": None, "redoc_url": None, "openapi_url": None})
 
+    if lifespan is None:
+        lifespan = lifespan_factory(settings)
+
     application = FastAPI(lifespan=lifespan, **kwargs)
     application.include_router(router)
 
+    application.add_middleware(ETagMiddleware, path_prefix="/api/v1/inbox")
+
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
             docs_router = APIRouter()
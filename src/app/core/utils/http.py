@@ -0,0 +1,16 @@
+from typing import Any
+
+from httpx import Response
+
+# Non-JSON error bodies (proxy or gateway pages) are truncated to this many bytes in error details.
+ERROR_SNIPPET_SIZE = 1024
+
+
+def error_detail(response: Response) -> Any:
+    """Return an upstream error body fit for an error detail: parsed JSON, or a bounded text snippet."""
+    if response.headers.get("Content-Type", "").startswith("application/json"):
+        try:
+            return response.json()
+        except ValueError:
+            pass
+    return response.content[:ERROR_SNIPPET_SIZE].decode("utf-8", errors="replace")
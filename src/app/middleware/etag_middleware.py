@@ -0,0 +1,48 @@
+import hashlib
+from typing import cast
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp
+
+# Headers a 304 must repeat from the 200 it stands in for (RFC 9110 section 15.4.5).
+NOT_MODIFIED_HEADERS = ("cache-control", "content-location", "date", "expires", "vary")
+
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """Middleware to tag GET responses with an ETag and answer matching If-None-Match requests with 304.
+
+    Only responses that were fully buffered by the route (i.e. carry a Content-Length) are hashed, so streamed
+    bodies are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/") -> None:
+        super().__init__(app)
+        self.path_prefix = path_prefix
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        # BaseHTTPMiddleware hands back the downstream response as a stream of body chunks.
+        response = cast(StreamingResponse, await call_next(request))
+
+        if (
+            request.method != "GET"
+            or response.status_code != 200
+            or not request.url.path.startswith(self.path_prefix)
+            or "content-length" not in response.headers
+            or "etag" in response.headers
+        ):
+            return response
+
+        body = b"".join([chunk.encode() if isinstance(chunk, str) else chunk async for chunk in response.body_iterator])
+        etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+        client_etags = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+        if etag in client_etags or "*" in client_etags:
+            headers = {name: response.headers[name] for name in NOT_MODIFIED_HEADERS if name in response.headers}
+            headers["ETag"] = etag
+            return Response(status_code=304, headers=headers)
+
+        headers = dict(response.headers)
+        headers["ETag"] = etag
+        return Response(content=body, status_code=response.status_code, headers=headers)
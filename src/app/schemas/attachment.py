@@ -7,7 +7,7 @@ from pydantic import BaseModel, ConfigDict, Field
 class AttachmentBase(BaseModel):
     """Schema for Microsoft Graph API attachment response"""
 
-    odata_context: Annotated[str, Field(alias="@odata.context")]
+    odata_context: Annotated[str | None, Field(alias="@odata.context")] = None
     odata_type: Annotated[str, Field(alias="@odata.type")]
     id: str
     lastModifiedDateTime: datetime
@@ -15,8 +15,14 @@ class AttachmentBase(BaseModel):
     contentType: str
     size: int
     isInline: bool
-    contentId: str | None
-    contentLocation: str | None
-    contentBytes: str
+    contentId: str | None = None
+    contentLocation: str | None = None
+    contentBytes: str | None = None
 
-    model_config = ConfigDict(populate_by_name=True)
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class AttachmentList(BaseModel):
+    """Schema for a Microsoft Graph API attachment collection response"""
+
+    value: list[AttachmentBase]
@@ -1,12 +1,50 @@
 from datetime import datetime
-from typing import Annotated, Literal
+from typing import Annotated, Literal, NotRequired
 
 from pydantic import BaseModel, ConfigDict, Field
+from typing_extensions import TypedDict
+
+
+class EmailAddress(BaseModel):
+    """Schema for Microsoft Graph API emailAddress resource"""
+
+    name: str
+    address: str
+
+
+class Recipient(BaseModel):
+    """Schema for Microsoft Graph API recipient resource"""
+
+    emailAddress: EmailAddress
+
+
+class ItemBody(BaseModel):
+    """Schema for Microsoft Graph API itemBody resource"""
+
+    contentType: Literal["text", "html"]
+    content: str
+
+
+class DateTimeTimeZone(TypedDict):
+    """Schema for Microsoft Graph API dateTimeTimeZone resource"""
+
+    dateTime: str
+    timeZone: str
+
+
+class FollowupFlag(TypedDict):
+    """Schema for Microsoft Graph API followupFlag resource"""
+
+    flagStatus: Literal["notFlagged", "complete", "flagged"]
+    completedDateTime: NotRequired[DateTimeTimeZone]
+    dueDateTime: NotRequired[DateTimeTimeZone]
+    startDateTime: NotRequired[DateTimeTimeZone]
+
 
 class EmailBase(BaseModel):
     """Schema for Microsoft Graph API message response"""
 
-    odata_context: Annotated[str, Field(alias="@odata.context")]
+    odata_context: Annotated[str | None, Field(alias="@odata.context")] = None
     odata_etag: Annotated[str, Field(alias="@odata.etag")]
     id: str
     createdDateTime: datetime
@@ -28,13 +66,19 @@ class EmailBase(BaseModel):
     isDraft: bool
     webLink: str
     inferenceClassification: Literal["focused", "other"]
-    body: dict[str, str]
-    sender: dict[str, dict[str, str]]
-    from_: Annotated[dict[str, dict[str, str]], Field(alias="from")]
-    toRecipients: list[dict[str, dict[str, str]]]
-    ccRecipients: list[dict[str, dict[str, str]]]
-    bccRecipients: list[dict[str, dict[str, str]]]
-    replyTo: list[dict[str, dict[str, str]]]
-    flag: dict[str, str]
-
-    model_config = ConfigDict(populate_by_name=True)
\ No newline at end of file
+    body: ItemBody
+    sender: Recipient
+    from_: Annotated[Recipient, Field(alias="from")]
+    toRecipients: list[Recipient]
+    ccRecipients: list[Recipient]
+    bccRecipients: list[Recipient]
+    replyTo: list[Recipient]
+    flag: FollowupFlag
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class EmailList(BaseModel):
+    """Schema for a Microsoft Graph API message collection response"""
+
+    value: list[EmailBase]
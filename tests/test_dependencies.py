@@ -0,0 +1,118 @@
+"""Unit tests for shared API dependencies."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.app.api import dependencies
+from src.app.api.dependencies import close_token_client, get_ms_token
+from src.app.core.exceptions.http_exceptions import NotFoundException
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Start every test with an empty token cache."""
+    dependencies._token_cache.clear()
+    yield
+    dependencies._token_cache.clear()
+
+
+def token_response(status_code: int = 200, headers: dict | None = None, **payload) -> httpx.Response:
+    return httpx.Response(status_code, headers=headers, json=payload)
+
+
+class TestGetMsToken:
+    """Test Microsoft Graph access token retrieval."""
+
+    @pytest.mark.asyncio
+    async def test_get_token_success(self):
+        """Test the access token is read from the identity endpoint response."""
+        with patch.object(dependencies, "token_client") as mock_client:
+            mock_client.post = AsyncMock(return_value=token_response(access_token="token", expires_in=3600))
+
+            result = await get_ms_token()
+
+            assert result == "token"
+            mock_client.post.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_token_cached(self):
+        """Test a valid cached token is reused without another round-trip."""
+        with patch.object(dependencies, "token_client") as mock_client:
+            mock_client.post = AsyncMock(return_value=token_response(access_token="token", expires_in=3600))
+
+            await get_ms_token()
+            result = await get_ms_token()
+
+            assert result == "token"
+            mock_client.post.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_token_refreshes_when_expired(self):
+        """Test an expired cached token triggers a refresh."""
+        with patch.object(dependencies, "token_client") as mock_client:
+            mock_client.post = AsyncMock(return_value=token_response(access_token="token", expires_in=0))
+
+            await get_ms_token()
+            await get_ms_token()
+
+            assert mock_client.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_token_retries_throttled_request(self):
+        """Test a throttled identity endpoint is retried after the Retry-After delay."""
+        with (
+            patch.object(dependencies, "token_client") as mock_client,
+            patch("src.app.api.dependencies.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+        ):
+            mock_client.post = AsyncMock(
+                side_effect=[
+                    token_response(status_code=429, headers={"Retry-After": "2"}, error="throttled"),
+                    token_response(access_token="token", expires_in=3600),
+                ]
+            )
+
+            result = await get_ms_token()
+
+            assert result == "token"
+            assert mock_client.post.call_count == 2
+            mock_sleep.assert_called_once_with(2.0)
+
+    @pytest.mark.asyncio
+    async def test_get_token_error(self):
+        """Test an identity endpoint error is surfaced."""
+        with patch.object(dependencies, "token_client") as mock_client:
+            mock_client.post = AsyncMock(return_value=token_response(status_code=401, error="invalid_client"))
+
+            with pytest.raises(NotFoundException, match="Error while getting access token"):
+                await get_ms_token()
+
+    @pytest.mark.asyncio
+    async def test_get_token_non_json_error_after_retries(self):
+        """Test a non-JSON throttling response is reported once the retries run out."""
+        with (
+            patch.object(dependencies, "token_client") as mock_client,
+            patch("src.app.api.dependencies.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            mock_client.post = AsyncMock(return_value=httpx.Response(503, html="<html>Service Unavailable</html>"))
+
+            with pytest.raises(NotFoundException, match="Service Unavailable"):
+                await get_ms_token()
+
+            assert mock_client.post.call_count == dependencies.TOKEN_MAX_RETRIES + 1
+
+
+class TestCloseTokenClient:
+    """Test identity endpoint client shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_close_token_client_replaces_client(self):
+        """Test closing leaves an open client behind for the next app lifespan."""
+        closed_client = dependencies.token_client
+
+        await close_token_client()
+
+        assert closed_client.is_closed
+        assert dependencies.token_client is not closed_client
+        assert not dependencies.token_client.is_closed
@@ -0,0 +1,271 @@
+"""Unit tests for inbox API endpoints."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from src.app.api.v1.inbox import get_attachment, get_attachments, get_email, get_emails, graph_cache
+from src.app.core.config import EnvironmentOption
+from src.app.core.exceptions.http_exceptions import CustomException
+
+MESSAGE = {
+    "@odata.etag": 'W/"etag"',
+    "id": "message-id",
+    "createdDateTime": "2024-01-01T00:00:00Z",
+    "lastModifiedDateTime": "2024-01-01T00:00:00Z",
+    "changeKey": "change-key",
+    "categories": [],
+    "receivedDateTime": "2024-01-01T00:00:00Z",
+    "sentDateTime": "2024-01-01T00:00:00Z",
+    "hasAttachments": True,
+    "internetMessageId": "<message@example.com>",
+    "subject": "Voicemail",
+    "bodyPreview": "You have a new voicemail",
+    "importance": "normal",
+    "parentFolderId": "inbox",
+    "conversationId": "conversation-id",
+    "isDeliveryReceiptRequested": False,
+    "isReadReceiptRequested": False,
+    "isRead": False,
+    "isDraft": False,
+    "webLink": "https://outlook.office365.com/owa/?ItemID=message-id",
+    "inferenceClassification": "focused",
+    "body": {"contentType": "html", "content": "<p>You have a new voicemail</p>"},
+    "sender": {"emailAddress": {"name": "Sender", "address": "sender@example.com"}},
+    "from": {"emailAddress": {"name": "Sender", "address": "sender@example.com"}},
+    "toRecipients": [{"emailAddress": {"name": "User", "address": "user@example.com"}}],
+    "ccRecipients": [],
+    "bccRecipients": [],
+    "replyTo": [],
+    "flag": {"flagStatus": "notFlagged"},
+}
+
+ATTACHMENT = {
+    "@odata.type": "#microsoft.graph.fileAttachment",
+    "id": "attachment-id",
+    "lastModifiedDateTime": "2024-01-01T00:00:00Z",
+    "name": "voicemail.wav",
+    "contentType": "audio/wav",
+    "size": 4,
+    "isInline": False,
+    "contentId": None,
+    "contentLocation": None,
+    "contentBytes": "UklGRg==",
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_graph_cache():
+    """Start every test with an empty Graph response cache."""
+    graph_cache.clear()
+    yield
+    graph_cache.clear()
+
+
+def graph_client(status_code: int = 200, payload: dict | None = None) -> Mock:
+    """Build a mock Graph client whose GET returns the given JSON payload."""
+    client = Mock(spec=httpx.AsyncClient)
+    client.send = AsyncMock(return_value=httpx.Response(status_code, json=payload))
+    return client
+
+
+class TestGetEmails:
+    """Test inbox listing endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_get_emails_success(self):
+        """Test messages are read from the Graph collection envelope."""
+        client = graph_client(payload={"@odata.context": "context", "value": [MESSAGE, MESSAGE]})
+
+        result = await get_emails("user-id", Response(), "token", client)
+
+        assert [email.id for email in result] == ["message-id", "message-id"]
+        client.build_request.assert_called_once_with(
+            "GET", "/user-id/messages", headers={"Authorization": "Bearer token"}
+        )
+        client.send.assert_called_once_with(client.build_request.return_value, stream=False)
+
+    @pytest.mark.asyncio
+    async def test_get_emails_filtered(self):
+        """Test date and attachment filters are pushed down to Graph as $filter."""
+        client = graph_client(payload={"@odata.context": "context", "value": [MESSAGE]})
+
+        received_after = datetime(2024, 1, 1, tzinfo=UTC)
+
+        await get_emails("user-id", Response(), "token", client, received_after=received_after, has_attachments=True)
+
+        client.build_request.assert_called_once_with(
+            "GET",
+            "/user-id/messages?$filter=hasAttachments%20eq%20true%20and%20receivedDateTime%20ge%202024-01-01T00%3A00%3A00Z",
+            headers={"Authorization": "Bearer token"},
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_emails_cached(self):
+        """Test repeat reads within the TTL are served from the in-process cache."""
+        client = graph_client(payload={"@odata.context": "context", "value": [MESSAGE]})
+
+        await get_emails("user-id", Response(), "token", client)
+        result = await get_emails("user-id", Response(), "token", client)
+
+        assert [email.id for email in result] == ["message-id"]
+        client.send.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_emails_retries_throttled_request(self):
+        """Test a 429 from Graph is retried after the Retry-After delay."""
+        client = graph_client()
+        client.send = AsyncMock(
+            side_effect=[
+                httpx.Response(429, headers={"Retry-After": "2"}, json={"error": {"code": "TooManyRequests"}}),
+                httpx.Response(200, json={"@odata.context": "context", "value": [MESSAGE]}),
+            ]
+        )
+
+        with patch("src.app.api.v1.inbox.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            result = await get_emails("user-id", Response(), "token", client)
+
+        assert [email.id for email in result] == ["message-id"]
+        assert client.send.call_count == 2
+        mock_sleep.assert_called_once_with(2.0)
+
+    @pytest.mark.asyncio
+    async def test_get_emails_graph_error(self):
+        """Test Graph errors are surfaced with the upstream status code."""
+        client = graph_client(status_code=403, payload={"error": {"code": "ErrorAccessDenied"}})
+
+        with pytest.raises(CustomException) as exc_info:
+            await get_emails("user-id", Response(), "token", client)
+
+        assert exc_info.value.status_code == 403
+        assert exc_info.value.detail == {"error": {"code": "ErrorAccessDenied"}}
+
+    @pytest.mark.asyncio
+    async def test_get_emails_non_json_error(self):
+        """Test a non-JSON error body is truncated into the error detail."""
+        client = graph_client()
+        client.send = AsyncMock(return_value=httpx.Response(502, html="<html>" + "x" * 4096 + "</html>"))
+
+        with pytest.raises(CustomException) as exc_info:
+            await get_emails("user-id", Response(), "token", client)
+
+        assert exc_info.value.status_code == 502
+        assert exc_info.value.detail == ("<html>" + "x" * 4096)[:1024]
+
+
+class TestGetEmail:
+    """Test single message endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_get_email_success(self):
+        """Test a single message is validated from the Graph response."""
+        client = graph_client(payload={"@odata.context": "context", **MESSAGE})
+
+        result = await get_email("user-id", "message-id", "token", client)
+
+        assert result.id == "message-id"
+        assert result.from_.emailAddress.address == "sender@example.com"
+
+    @pytest.mark.asyncio
+    async def test_get_email_flagged(self):
+        """Test a flagged message with dateTimeTimeZone due and start dates validates."""
+        flag = {
+            "flagStatus": "flagged",
+            "dueDateTime": {"dateTime": "2024-01-08T00:00:00.0000000", "timeZone": "UTC"},
+            "startDateTime": {"dateTime": "2024-01-01T00:00:00.0000000", "timeZone": "UTC"},
+        }
+        client = graph_client(payload={"@odata.context": "context", **MESSAGE, "flag": flag})
+
+        result = await get_email("user-id", "message-id", "token", client)
+
+        assert result.flag == flag
+
+    @pytest.mark.asyncio
+    async def test_get_email_passthrough(self):
+        """Test the Graph body is passed through untouched outside local development."""
+        client = graph_client(payload={"@odata.context": "context", **MESSAGE})
+
+        with patch("src.app.api.v1.inbox.settings") as mock_settings:
+            mock_settings.ENVIRONMENT = EnvironmentOption.PRODUCTION
+
+            result = await get_email("user-id", "message-id", "token", client)
+
+        assert isinstance(result, Response)
+        assert result.body == client.send.return_value.content
+
+
+class TestGetAttachments:
+    """Test attachment listing endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_get_attachments_success(self):
+        """Test attachments are read from the Graph collection envelope."""
+        client = graph_client(payload={"@odata.context": "context", "value": [ATTACHMENT]})
+
+        response = Response()
+
+        result = await get_attachments("user-id", "message-id", response, "token", client)
+
+        assert [attachment.name for attachment in result] == ["voicemail.wav"]
+        assert response.headers["Cache-Control"] == "private, max-age=15"
+        client.build_request.assert_called_once_with(
+            "GET",
+            "/user-id/messages/message-id/attachments?$select=id,lastModifiedDateTime,name,contentType,size,isInline",
+            headers={"Authorization": "Bearer token"},
+        )
+
+
+class TestGetAttachment:
+    """Test single attachment endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_get_attachment_success(self):
+        """Test a single attachment is validated from the Graph response."""
+        client = graph_client(payload={"@odata.context": "context", **ATTACHMENT})
+
+        response = Response()
+
+        result = await get_attachment("user-id", "message-id", "attachment-id", response, "token", client)
+
+        assert result.name == "voicemail.wav"
+        assert response.headers["Cache-Control"] == "private, max-age=86400, immutable"
+        assert response.headers["ETag"] == '"attachment-id"'
+        client.send.assert_called_once_with(client.build_request.return_value, stream=True)
+
+    @pytest.mark.asyncio
+    async def test_get_attachment_not_modified(self):
+        """Test a matching If-None-Match is answered without calling Graph."""
+        client = graph_client()
+
+        result = await get_attachment(
+            "user-id", "message-id", "attachment-id", Response(), "token", client, if_none_match='"attachment-id"'
+        )
+
+        assert result.status_code == 304
+        client.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_attachment_streams(self):
+        """Test the attachment body is streamed outside local development."""
+        client = graph_client(payload={"@odata.context": "context", **ATTACHMENT})
+
+        with patch("src.app.api.v1.inbox.settings") as mock_settings:
+            mock_settings.ENVIRONMENT = EnvironmentOption.PRODUCTION
+
+            result = await get_attachment("user-id", "message-id", "attachment-id", Response(), "token", client)
+
+        assert isinstance(result, StreamingResponse)
+
+    @pytest.mark.asyncio
+    async def test_get_attachment_not_found(self):
+        """Test a missing attachment raises with the Graph status code."""
+        client = graph_client(status_code=404, payload={"error": {"code": "ErrorItemNotFound"}})
+
+        with pytest.raises(CustomException) as exc_info:
+            await get_attachment("user-id", "message-id", "attachment-id", Response(), "token", client)
+
+        assert exc_info.value.status_code == 404
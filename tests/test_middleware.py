@@ -0,0 +1,69 @@
+"""Unit tests for custom middleware."""
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.app.middleware.etag_middleware import ETagMiddleware
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware, path_prefix="/inbox")
+
+    @app.get("/inbox/item")
+    async def item(response: Response) -> dict[str, str]:
+        response.headers["Cache-Control"] = "private, max-age=15"
+        return {"id": "item"}
+
+    @app.get("/inbox/stream")
+    async def stream() -> StreamingResponse:
+        return StreamingResponse(iter([b'{"id": "stream"}']), media_type="application/json")
+
+    @app.get("/other")
+    async def other() -> dict[str, str]:
+        return {"id": "other"}
+
+    return app
+
+
+class TestETagMiddleware:
+    """Test ETag / If-None-Match handling."""
+
+    def test_etag_added(self):
+        """Test buffered GET responses under the prefix get an ETag."""
+        client = TestClient(create_app())
+
+        response = client.get("/inbox/item")
+
+        assert response.status_code == 200
+        assert response.json() == {"id": "item"}
+        assert response.headers["ETag"].startswith('W/"')
+
+    def test_if_none_match_returns_not_modified(self):
+        """Test a matching If-None-Match short-circuits with 304 and no body."""
+        client = TestClient(create_app())
+        etag = client.get("/inbox/item").headers["ETag"]
+
+        response = client.get("/inbox/item", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert response.headers["Cache-Control"] == "private, max-age=15"
+
+    def test_stale_if_none_match_returns_body(self):
+        """Test a stale If-None-Match returns the full response."""
+        client = TestClient(create_app())
+
+        response = client.get("/inbox/item", headers={"If-None-Match": 'W/"stale"'})
+
+        assert response.status_code == 200
+        assert response.json() == {"id": "item"}
+
+    def test_streamed_and_unmatched_paths_untouched(self):
+        """Test streamed bodies and paths outside the prefix are not tagged."""
+        client = TestClient(create_app())
+
+        assert "ETag" not in client.get("/inbox/stream").headers
+        assert "ETag" not in client.get("/other").headers
@@ -0,0 +1,66 @@
+"""Unit tests for application setup."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import FastAPI
+
+from src.app.api.dependencies import get_graph_client
+from src.app.core.config import MicrosoftGraphSettings
+from src.app.core.setup import lifespan_factory
+
+
+class TestLifespanFactory:
+    """Test the application lifespan."""
+
+    @pytest.mark.asyncio
+    async def test_lifespan_manages_graph_clients(self):
+        """Test the pooled HTTP/2 Graph client is opened, the token prefetched, and both clients closed on exit."""
+        settings = MicrosoftGraphSettings(CLIENT_ID="client-id", GRAPH_API_URL="https://graph.example.com/v1.0/users")
+        app = FastAPI()
+
+        with (
+            patch("src.app.core.setup.AsyncClient") as mock_client_class,
+            patch("src.app.core.setup.get_ms_token", new_callable=AsyncMock) as mock_get_token,
+            patch("src.app.core.setup.close_token_client", new_callable=AsyncMock) as mock_close_token_client,
+        ):
+            graph_client = mock_client_class.return_value
+            graph_client.aclose = AsyncMock()
+
+            async with lifespan_factory(settings)(app):
+                assert get_graph_client(Mock(app=app)) is graph_client
+                mock_get_token.assert_awaited_once()
+
+            _, kwargs = mock_client_class.call_args
+            assert kwargs["http2"] is True
+            assert kwargs["base_url"] == "https://graph.example.com/v1.0/users"
+            graph_client.aclose.assert_awaited_once()
+            mock_close_token_client.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lifespan_skips_prefetch_without_client_id(self):
+        """Test the token is not prefetched when no Graph credentials are configured."""
+        with (
+            patch("src.app.core.setup.AsyncClient") as mock_client_class,
+            patch("src.app.core.setup.get_ms_token", new_callable=AsyncMock) as mock_get_token,
+            patch("src.app.core.setup.close_token_client", new_callable=AsyncMock),
+        ):
+            mock_client_class.return_value.aclose = AsyncMock()
+
+            async with lifespan_factory(MicrosoftGraphSettings(CLIENT_ID=""))(FastAPI()):
+                pass
+
+            mock_get_token.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lifespan_startup_error_not_masked(self):
+        """Test a failure creating the Graph client is raised as-is instead of an error from cleanup."""
+        with (
+            patch("src.app.core.setup.AsyncClient", side_effect=ImportError("h2 is not installed")),
+            patch("src.app.core.setup.close_token_client", new_callable=AsyncMock) as mock_close_token_client,
+        ):
+            with pytest.raises(ImportError, match="h2 is not installed"):
+                async with lifespan_factory(MicrosoftGraphSettings())(FastAPI()):
+                    pass
+
+            mock_close_token_client.assert_awaited_once()